@@ -0,0 +1,209 @@
+"""
+Response encoding helpers.
+
+orjson, msgpack and brotli are listed in requirements.txt. If one is missing
+JSON falls back to the standard library, brotli is never offered, and
+requests that only accept msgpack get a 406.
+"""
+import json
+import logging
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are not worth compressing
+COMPRESSION_MIN_BYTES = 1024
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+JSON_MEDIA_TYPES = ("application/json", "application/*", "*/*")
+
+
+def _header_quality(header: str, names) -> Optional[float]:
+    """
+    Highest q-value given to any of names in an Accept-style header, or
+    None when none of them is listed
+    """
+    quality = None
+    for part in header.split(","):
+        name, *params = part.strip().split(";")
+        if name.strip().lower() not in names:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality = q if quality is None else max(quality, q)
+    return quality
+
+
+def _encoding_quality(request: Request, encoding: str) -> float:
+    """
+    q-value the client gives an encoding in Accept-Encoding, falling back to
+    the "*" entry; 0 when it is not acceptable
+    """
+    header = request.headers.get("accept-encoding", "")
+    quality = _header_quality(header, (encoding,))
+    if quality is None:
+        quality = _header_quality(header, ("*",))
+    return quality or 0.0
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    """
+    Check whether the client accepts an encoding, either by name or through
+    "*" (ignoring encodings explicitly refused with q=0)
+    """
+    return _encoding_quality(request, encoding) > 0
+
+
+def negotiate_content_encoding(request: Request) -> Optional[str]:
+    """
+    Pick the available compression the client rates highest, preferring br
+    on ties. None means send the body uncompressed.
+    """
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = _encoding_quality(request, encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def negotiate_media_type(request: Request) -> str:
+    """
+    Pick msgpack or JSON for a response from the Accept header. Raises 406
+    when msgpack is the only acceptable type but is not installed.
+    """
+    accept = request.headers.get("accept", "")
+    msgpack_quality = _header_quality(accept, MSGPACK_MEDIA_TYPES) or 0.0
+    json_quality = _header_quality(accept, JSON_MEDIA_TYPES)
+    if json_quality is None:
+        # No Accept header means anything goes; an Accept header that lists
+        # only msgpack rules JSON out
+        json_quality = 0.0 if msgpack_quality > 0 else 1.0
+
+    if msgpack_quality > 0 and msgpack_quality >= json_quality:
+        if msgpack is not None:
+            return "application/msgpack"
+        if json_quality <= 0:
+            raise HTTPException(
+                status_code=406,
+                detail="application/msgpack is not available on this server"
+            )
+    return "application/json"
+
+
+def gzip_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    """
+    Gzip a stream of text chunks incrementally
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def utf8_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+class ResponseSizeMetrics:
+    """
+    In-process counters of response sizes before and after encoding,
+    grouped by endpoint, media type and content encoding
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def record(self, name: str, raw_bytes: int, encoded_bytes: int) -> None:
+        with self._lock:
+            counter = self._counters.setdefault(
+                name, {"responses": 0, "raw_bytes": 0, "encoded_bytes": 0}
+            )
+            counter["responses"] += 1
+            counter["raw_bytes"] += raw_bytes
+            counter["encoded_bytes"] += encoded_bytes
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counter) for name, counter in self._counters.items()}
+
+
+response_size_metrics = ResponseSizeMetrics()
+
+
+def _serialize(payload: Any, media_type: str) -> bytes:
+    if media_type == "application/msgpack":
+        return msgpack.packb(payload, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def encoded_response(
+        request: Request,
+        payload: Any,
+        name: str,
+        media_type: Optional[str] = None
+) -> Response:
+    """
+    Serialize a payload using the most compact encoding the client accepts,
+    compress it when worthwhile and record its size under name. Pass the
+    result of negotiate_media_type to reject unacceptable requests before
+    doing any work.
+    """
+    if media_type is None:
+        media_type = negotiate_media_type(request)
+    body = _serialize(payload, media_type)
+    raw_size = len(body)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+
+    if raw_size >= COMPRESSION_MIN_BYTES:
+        content_encoding = negotiate_content_encoding(request)
+        if content_encoding == "br":
+            body = brotli.compress(body, quality=5)
+            headers["Content-Encoding"] = "br"
+        elif content_encoding == "gzip":
+            compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+            body = compressor.compress(body) + compressor.flush()
+            headers["Content-Encoding"] = "gzip"
+
+    content_encoding = headers.get("Content-Encoding", "identity")
+    response_size_metrics.record(
+        f"{name} {media_type} {content_encoding}", raw_size, len(body)
+    )
+    logger.info(
+        f"{name} response: {raw_size} bytes {media_type}, "
+        f"{len(body)} bytes {content_encoding}"
+    )
+    return Response(content=body, media_type=media_type, headers=headers)
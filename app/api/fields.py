@@ -0,0 +1,89 @@
+from typing import Any, Dict, FrozenSet, Optional
+
+from fastapi import HTTPException
+
+from app.models.video import Video
+
+# Projections accepted by ?fields= on transcription responses
+TRANSCRIPTION_FIELDS = {
+    "text": "full transcription text",
+    "segments": "segment timing and text, without words",
+    "words": "segments including word-level timestamps",
+    "sentiment": "full-text sentiment and per-segment compound scores",
+    "analysis": "complete NLP analysis for the full text and every segment",
+}
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a comma separated ?fields= value, None meaning the full response
+    """
+    if fields is None:
+        return None
+    requested = frozenset(field.strip() for field in fields.split(",") if field.strip())
+    unknown = requested - TRANSCRIPTION_FIELDS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {sorted(unknown)}; "
+                   f"valid fields are {sorted(TRANSCRIPTION_FIELDS)}"
+        )
+    return requested
+
+
+def project_transcription(video: Video, fields: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    """
+    Build a transcription response containing only the requested fields
+    """
+    response = {
+        "id": video.id,
+        "status": video.status.value,
+        "processed_time": video.processed_time.isoformat() if video.processed_time else None
+    }
+    details = video.transcription_details or {}
+
+    if fields is None:
+        response["transcription"] = video.transcription
+        response["details"] = details
+        return response
+
+    analysis = details.get("analysis") or {}
+
+    if "text" in fields:
+        response["transcription"] = video.transcription
+
+    if "words" in fields:
+        response["segments"] = details.get("segments", [])
+    elif "segments" in fields:
+        response["segments"] = [
+            {key: value for key, value in segment.items() if key != "words"}
+            for segment in details.get("segments", [])
+        ]
+
+    if "sentiment" in fields:
+        response["sentiment"] = {
+            "full_text": (analysis.get("full_text") or {}).get("sentiment"),
+            "segments": [
+                {
+                    "start": segment["start"],
+                    "end": segment["end"],
+                    "compound": segment["nlp_analysis"]["sentiment"]["compound"]
+                }
+                for segment in analysis.get("segments", [])
+            ]
+        }
+
+    if "analysis" in fields:
+        response["analysis"] = {
+            "full_text": analysis.get("full_text"),
+            "segments": [
+                {
+                    "start": segment["start"],
+                    "end": segment["end"],
+                    "nlp_analysis": segment["nlp_analysis"]
+                }
+                for segment in analysis.get("segments", [])
+            ]
+        }
+
+    return response
@@ -1,17 +1,45 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request, Body
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterator, List, Optional
+from app.api.encoding import (
+    accepts_encoding, encoded_response, gzip_stream, negotiate_media_type, utf8_stream
+)
+from app.api.fields import TRANSCRIPTION_FIELDS, parse_fields, project_transcription
 from app.services.s3 import S3Service
-from app.services.transcription import TranscriptionService
+from app.services.transcription import DeferredVideo, TranscriptionError, TranscriptionService
 from app.crud.video import VideoRepository
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.models.video import Video, ProcessingStatus
 from app.services.nlp import NLPService
+from app.services.pipeline import complete_transcription
+from app.services.timeline import TIMELINE_RESOLUTIONS
+from app.services.export import ExportFormat, MEDIA_TYPES, export_segments
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Unnest stored segments server-side so they can be fetched incrementally
+# instead of loading the whole transcription_details document
+SEGMENTS_QUERY = text("""
+    SELECT seg.value
+    FROM videos,
+         jsonb_array_elements(videos.transcription_details -> 'segments')
+             WITH ORDINALITY AS seg(value, position)
+    WHERE videos.id = :video_id
+      AND (CAST(:start AS float) IS NULL OR (seg.value ->> 'end')::float > :start)
+      AND (CAST(:end AS float) IS NULL OR (seg.value ->> 'start')::float < :end)
+    ORDER BY seg.position
+""")
+
+SEGMENTS_FETCH_SIZE = 200
+
+# Upper bound on videos per batch transcription request
+MAX_BATCH_VIDEOS = 64
+
 
 @router.post("/upload")
 async def upload_video(
@@ -59,13 +87,97 @@ async def upload_video(
         )
 
 
+@router.post("/transcribe/batch")
+async def transcribe_videos_batch(
+        video_ids: List[int] = Body(..., embed=True),
+        transcription_service: TranscriptionService = Depends(TranscriptionService),
+        nlp_service: NLPService = Depends(NLPService),
+        db: Session = Depends(get_db)
+):
+    """
+    Transcribe several short clips in one call, decoding them together.
+    Videos longer than 30 seconds are queued for the transcription worker
+    rather than transcribed inside the request, and videos that are already
+    being processed are left alone.
+    """
+    if not video_ids or len(video_ids) > MAX_BATCH_VIDEOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide between 1 and {MAX_BATCH_VIDEOS} video ids"
+        )
+
+    found = {
+        row[0] for row in db.query(Video.id).filter(Video.id.in_(video_ids)).all()
+    }
+    missing = [video_id for video_id in video_ids if video_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Videos not found: {missing}")
+
+    videos = await VideoRepository.claim_videos(db, video_ids)
+    claimed = {video.id for video in videos}
+    response = [
+        {
+            "id": video_id,
+            "status": ProcessingStatus.PROCESSING.value,
+            "error": "Video is already being processed"
+        }
+        for video_id in video_ids if video_id not in claimed
+    ]
+
+    video_ids = [video.id for video in videos]
+    results = await transcription_service.process_videos(
+        [video.s3_url for video in videos], transcribe_long=False
+    )
+
+    for video_id, result in zip(video_ids, results):
+        try:
+            if isinstance(result, DeferredVideo):
+                await VideoRepository.requeue(db, video_id, result.duration)
+                response.append({"id": video_id, "status": ProcessingStatus.QUEUED.value})
+                continue
+            if isinstance(result, TranscriptionError):
+                raise result
+            video = await complete_transcription(db, nlp_service, video_id, result)
+            response.append({
+                "id": video.id,
+                "status": video.status.value,
+                "transcription": video.transcription
+            })
+        except Exception as e:
+            logger.error(f"Error transcribing video {video_id}: {str(e)}")
+            db.rollback()
+            await VideoRepository.mark_failed(db, video_id, str(e))
+            response.append({
+                "id": video_id,
+                "status": ProcessingStatus.FAILED.value,
+                "error": str(e)
+            })
+
+    return {"videos": response}
+
+
 @router.post("/{video_id}/transcribe")
 async def transcribe_video(
         video_id: int,
+        request: Request,
+        fields: Optional[str] = Query(
+            None,
+            description="Comma separated subset of: " + ", ".join(
+                f"{name} ({meaning})" for name, meaning in TRANSCRIPTION_FIELDS.items()
+            )
+        ),
         transcription_service: TranscriptionService = Depends(TranscriptionService),
         nlp_service: NLPService = Depends(NLPService),
         db: Session = Depends(get_db)
 ):
+    """
+    Transcribe and analyze a video. The response can be trimmed with
+    ?fields= and is encoded as msgpack when requested via Accept, otherwise
+    as JSON, compressed with br or gzip when the client accepts it.
+    """
+    requested_fields = parse_fields(fields)
+    media_type = negotiate_media_type(request)
+
     video = db.query(Video).filter(Video.id == video_id).first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
@@ -77,26 +189,17 @@ async def transcribe_video(
         # Now returns detailed transcription
         transcription_details = await transcription_service.process_video(video.s3_url)
 
-        # Add NLP analysis
-        full_text_analysis = nlp_service.analyze_text(transcription_details["text"])
-        segment_analysis = nlp_service.analyze_segments(transcription_details["segments"])
-
-        analysis_results = {
-            "full_text": full_text_analysis,
-            "segments": segment_analysis
-        }
-
-        transcription_details["analysis"] = analysis_results
-
-        video = await VideoRepository.update_transcription(db, video_id, transcription_details)
+        # Add NLP analysis and timeline aggregates
+        video = await complete_transcription(
+            db, nlp_service, video_id, transcription_details
+        )
 
-        return {
-            "id": video.id,
-            "status": video.status.value,
-            "transcription": video.transcription,
-            "details": video.transcription_details,
-            "processed_time": video.processed_time.isoformat() if video.processed_time else None
-        }
+        return encoded_response(
+            request,
+            project_transcription(video, requested_fields),
+            name="transcribe",
+            media_type=media_type
+        )
     except Exception as e:
         logger.error(f"Error transcribing video: {str(e)}")
         video.status = ProcessingStatus.FAILED
@@ -105,4 +208,105 @@ async def transcribe_video(
         raise HTTPException(
             status_code=500,
             detail=f"Error transcribing video: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/{video_id}/timeline")
+async def get_timeline(
+        video_id: int,
+        resolution: int = Query(60, description="Bucket width in seconds"),
+        db: Session = Depends(get_db)
+):
+    """
+    Return precomputed sentiment and entity aggregates at one resolution
+    """
+    if resolution not in TIMELINE_RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Resolution must be one of {list(TIMELINE_RESOLUTIONS)}"
+        )
+
+    # Pull only the requested resolution out of the JSONB column instead of
+    # loading the row, which carries the full transcription
+    row = db.query(
+        Video.status,
+        Video.timeline["duration"],
+        Video.timeline["resolutions"][str(resolution)]
+    ).filter(Video.id == video_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    status, duration, buckets = row
+    if buckets is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Timeline not available for this video"
+        )
+
+    return {
+        "id": video_id,
+        "status": status.value,
+        "duration": duration,
+        **buckets
+    }
+
+
+def stream_segments(
+        video_id: int,
+        start: Optional[float],
+        end: Optional[float]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield stored segments in order, fetching them from the database in small
+    batches. Uses its own session because request-scoped sessions are closed
+    before a streaming response body is sent.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            SEGMENTS_QUERY,
+            {"video_id": video_id, "start": start, "end": end},
+            execution_options={"yield_per": SEGMENTS_FETCH_SIZE}
+        )
+        for row in result:
+            yield row[0]
+    finally:
+        db.close()
+
+
+@router.get("/{video_id}/export")
+async def export_transcript(
+        video_id: int,
+        request: Request,
+        export_format: ExportFormat = Query(ExportFormat.SRT, alias="format"),
+        start: Optional[float] = Query(None, ge=0, description="Range start in seconds"),
+        end: Optional[float] = Query(None, gt=0, description="Range end in seconds"),
+        db: Session = Depends(get_db)
+):
+    """
+    Stream the transcript as SRT, WebVTT, JSON Lines or plain text
+    """
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be less than end")
+
+    row = db.query(
+        Video.id,
+        Video.transcription_details.isnot(None)
+    ).filter(Video.id == video_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if not row[1]:
+        raise HTTPException(status_code=404, detail="Transcription not available")
+
+    chunks = export_segments(stream_segments(video_id, start, end), export_format)
+    headers = {
+        "Content-Disposition": f'attachment; filename="video-{video_id}.{export_format.value}"',
+        "Vary": "Accept-Encoding"
+    }
+    if accepts_encoding(request, "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_stream(chunks)
+    else:
+        body = utf8_stream(chunks)
+
+    return StreamingResponse(body, media_type=MEDIA_TYPES[export_format], headers=headers)
\ No newline at end of file
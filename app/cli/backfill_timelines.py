@@ -0,0 +1,75 @@
+"""
+Build timelines for videos analyzed before timelines were stored.
+
+Usage:
+    python -m app.cli.backfill_timelines
+    python -m app.cli.backfill_timelines --batch-size 50
+
+Reads the stored transcription_details["analysis"]["segments"] of every video
+without a timeline and writes the aggregates, committing once per batch.
+Safe to interrupt and rerun: finished videos no longer match the query.
+"""
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from app.core.logging import setup_logging
+from app.db.session import SessionLocal
+from app.models.video import Video
+from app.services.timeline import build_timeline
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(batch_size: int) -> int:
+    db = SessionLocal()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            # Keyset pagination; only the analyzed segments are loaded
+            rows = (
+                db.query(Video.id, Video.transcription_details["analysis"]["segments"])
+                .filter(
+                    Video.id > last_id,
+                    Video.timeline.is_(None),
+                    Video.transcription_details["analysis"]["segments"].isnot(None)
+                )
+                .order_by(Video.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return updated
+
+            for video_id, segments in rows:
+                db.query(Video).filter(Video.id == video_id).update(
+                    {Video.timeline: build_timeline(segments or [])},
+                    synchronize_session=False
+                )
+            db.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+            logger.info(f"Backfilled timelines for {updated} videos")
+    finally:
+        db.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill videos.timeline")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="Videos loaded and committed per batch")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    setup_logging()
+    args = parse_args(argv)
+    updated = backfill(args.batch_size)
+    logger.info(f"Backfill complete: {updated} videos updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
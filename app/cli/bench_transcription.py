@@ -0,0 +1,104 @@
+"""
+CPU benchmark of batched versus one-at-a-time transcription of short clips.
+
+Usage:
+    python -m app.cli.bench_transcription clip.wav --clips 16 --batch-sizes 1 2 4 8 16
+    python -m app.cli.bench_transcription --random-weights --clips 8
+
+The first 30 seconds of the input are used as the clip and repeated --clips
+times; without an input, --seconds of low-level noise is used. The baseline
+runs Whisper's transcribe() per clip (without word timestamps, which
+batching also skips); each batch size then runs transcribe_batch over the
+same clips.
+
+--random-weights builds a randomly initialized model with the same
+dimensions instead of loading the checkpoint, for hosts that cannot download
+it. Compute per forward pass is the same, but the random decoder never emits
+end-of-text early, so every clip decodes the maximum sample length: treat
+the numbers as relative between batch sizes, not as absolute throughput.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import CHUNK_LENGTH, SAMPLE_RATE
+from whisper.model import ModelDimensions, Whisper
+
+from app.services.transcription import TranscriptionService
+
+
+# Dimensions of the published "base" checkpoint
+BASE_DIMENSIONS = ModelDimensions(
+    n_mels=80, n_audio_ctx=1500, n_audio_state=512, n_audio_head=8, n_audio_layer=6,
+    n_vocab=51865, n_text_ctx=448, n_text_state=512, n_text_head=8, n_text_layer=6
+)
+
+
+def load_model(args: argparse.Namespace) -> Whisper:
+    if args.random_weights:
+        torch.manual_seed(0)
+        return Whisper(BASE_DIMENSIONS).to("cpu").eval()
+    return whisper.load_model(args.model, device="cpu")
+
+
+async def bench(args: argparse.Namespace) -> None:
+    # Skip __init__: it loads the default checkpoint and an S3 client
+    service = TranscriptionService.__new__(TranscriptionService)
+    service.model = load_model(args)
+
+    if args.video:
+        audio = service.load_clip(Path(args.video))[:CHUNK_LENGTH * SAMPLE_RATE]
+    else:
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(int(args.seconds * SAMPLE_RATE)) * 0.01).astype(np.float32)
+    clips = [audio] * args.clips
+    model_name = "base (random weights)" if args.random_weights else args.model
+    print(
+        f"{args.clips} clips of {len(audio) / SAMPLE_RATE:.1f}s, model={model_name}, "
+        f"device=cpu, threads={torch.get_num_threads()}"
+    )
+
+    # Warm up so model/tokenizer setup is not attributed to the first run
+    await service.transcribe_batch(clips[:1])
+
+    started = time.perf_counter()
+    for clip in clips:
+        # temperature=0 disables fallback retries, matching transcribe_batch
+        service.model.transcribe(clip, fp16=False, temperature=0.0)
+    elapsed = time.perf_counter() - started
+    print(f"{'sequential':>12}: {args.clips / elapsed:7.2f} clips/sec ({elapsed:.1f}s)")
+
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        for start in range(0, len(clips), batch_size):
+            await service.transcribe_batch(clips[start:start + batch_size])
+        elapsed = time.perf_counter() - started
+        print(f"{'batch ' + str(batch_size):>12}: {args.clips / elapsed:7.2f} clips/sec ({elapsed:.1f}s)")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark batched transcription on CPU")
+    parser.add_argument("video", nargs="?", help="Video or audio file to take the clip from")
+    parser.add_argument("--seconds", type=float, default=CHUNK_LENGTH,
+                        help="Length of the generated clip when no file is given")
+    parser.add_argument("--random-weights", action="store_true",
+                        help="Use randomly initialized base-sized weights")
+    parser.add_argument("--clips", type=int, default=16)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--model", default="base")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    asyncio.run(bench(parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Bulk ingestion of existing video archives.
+
+Usage:
+    python -m app.cli.ingest /path/to/videos
+    python -m app.cli.ingest s3://source-bucket/some/prefix --enqueue
+
+Files are uploaded concurrently, registered with batched multi-row inserts,
+and skipped on later runs if their S3 URL already has a video record, so an
+interrupted run can simply be started again.
+
+Object keys look like videos/<source id>/<fingerprint>/<relative path>: the
+source id separates archives with the same layout, and the fingerprint
+(size and mtime for local files, ETag for S3 objects) ties a key to one
+version of a file, so a changed file is ingested again rather than being
+taken for the one already registered.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from app.core.logging import setup_logging
+from app.crud.video import VideoRepository
+from app.db.session import SessionLocal
+from app.models.video import ProcessingStatus
+from app.services.s3 import S3Service
+
+logger = logging.getLogger(__name__)
+
+# Number of candidate URLs checked against the database per query
+RESUME_CHECK_CHUNK = 1000
+
+
+@dataclass
+class IngestItem:
+    filename: str
+    object_key: str
+    content_type: str
+    local_path: Optional[Path] = None
+    source_bucket: Optional[str] = None
+    source_key: Optional[str] = None
+
+
+def guess_video_type(name: str) -> Optional[str]:
+    content_type, _ = mimetypes.guess_type(name)
+    if content_type and content_type.startswith("video/"):
+        return content_type
+    return None
+
+
+def short_hash(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:12]
+
+
+def scan_directory(root: Path) -> Iterator[IngestItem]:
+    root = root.resolve()
+    source_id = short_hash(f"file://{root}")
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        content_type = guess_video_type(path.name)
+        if not content_type:
+            continue
+        stat = path.stat()
+        fingerprint = short_hash(f"{stat.st_size}:{stat.st_mtime_ns}")
+        relative = path.relative_to(root).as_posix()
+        yield IngestItem(
+            filename=path.name,
+            object_key=f"videos/{source_id}/{fingerprint}/{relative}",
+            content_type=content_type,
+            local_path=path
+        )
+
+
+def scan_s3_prefix(s3_service: S3Service, source: str) -> Iterator[IngestItem]:
+    bucket, _, prefix = source[len("s3://"):].partition("/")
+    source_id = short_hash(f"s3://{bucket}/{prefix}")
+    for key, etag in s3_service.list_objects(bucket, prefix):
+        content_type = guess_video_type(key)
+        if not content_type:
+            continue
+        if bucket == s3_service.bucket_name:
+            # Already in our bucket: register in place, nothing to transfer
+            object_key = key
+        else:
+            relative = key[len(prefix):].lstrip("/")
+            object_key = f"videos/{source_id}/{short_hash(etag)}/{relative}"
+        yield IngestItem(
+            filename=key.rsplit("/", 1)[-1],
+            object_key=object_key,
+            content_type=content_type,
+            source_bucket=bucket,
+            source_key=key
+        )
+
+
+class BulkIngestor:
+    def __init__(
+            self,
+            s3_service: S3Service,
+            concurrency: int,
+            batch_size: int,
+            enqueue: bool,
+            created_by: Optional[str] = None
+    ):
+        self.s3_service = s3_service
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.status = ProcessingStatus.QUEUED if enqueue else ProcessingStatus.UPLOADED
+        self.created_by = created_by
+        self.db = SessionLocal()
+
+        self.pending: List[dict] = []
+        self.total = 0
+        self.skipped = 0
+        self.ingested = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    async def filter_new(self, items: List[IngestItem]) -> List[IngestItem]:
+        """
+        Drop items whose S3 URL is already registered (resume support)
+        """
+        remaining = []
+        for i in range(0, len(items), RESUME_CHECK_CHUNK):
+            chunk = items[i:i + RESUME_CHECK_CHUNK]
+            existing = await VideoRepository.existing_s3_urls(
+                self.db,
+                (self.s3_service.object_url(item.object_key) for item in chunk)
+            )
+            remaining.extend(
+                item for item in chunk
+                if self.s3_service.object_url(item.object_key) not in existing
+            )
+        return remaining
+
+    async def transfer(
+            self,
+            item: IngestItem,
+            semaphore: asyncio.Semaphore
+    ) -> Tuple[IngestItem, Optional[str]]:
+        async with semaphore:
+            if item.local_path is not None:
+                s3_url = await self.s3_service.upload_path(
+                    item.local_path, item.object_key, item.content_type
+                )
+            elif item.source_bucket == self.s3_service.bucket_name:
+                # Registered in place, so the stored ContentType must already
+                # pass the video/* check transcription does after download
+                s3_url = await self.s3_service.ensure_video_content_type(
+                    item.object_key, item.content_type
+                )
+            else:
+                s3_url = await self.s3_service.copy_object(
+                    item.source_bucket, item.source_key, item.object_key, item.content_type
+                )
+            return item, s3_url
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        ids = await VideoRepository.create_videos(
+            self.db, self.pending, status=self.status, created_by=self.created_by
+        )
+        self.ingested += len(ids)
+        self.pending = []
+
+    def report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self.last_report < 5:
+            return
+        self.last_report = now
+        done = self.ingested + self.failed + len(self.pending)
+        rate = done / max(now - self.started, 1e-9)
+        logger.info(
+            f"Ingest progress: {done}/{self.total} processed, "
+            f"{self.ingested} registered, {self.failed} failed, "
+            f"{self.skipped} skipped, {rate:.1f} files/sec"
+        )
+
+    async def run(self, items: List[IngestItem]) -> None:
+        candidates = len(items)
+        items = await self.filter_new(items)
+        self.skipped = candidates - len(items)
+        self.total = len(items)
+        logger.info(
+            f"Found {candidates} videos, {self.skipped} already ingested, "
+            f"{self.total} to go"
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.ensure_future(self.transfer(item, semaphore))
+            for item in items
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                item, s3_url = await future
+                if s3_url:
+                    self.pending.append({"filename": item.filename, "s3_url": s3_url})
+                else:
+                    self.failed += 1
+                if len(self.pending) >= self.batch_size:
+                    await self.flush()
+                self.report()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Register whatever finished uploading before stopping so the next
+            # run does not have to transfer it again
+            await self.flush()
+            self.report(force=True)
+            self.db.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Bulk ingest videos from a local directory or S3 prefix"
+    )
+    parser.add_argument("source", help="Local directory or s3://bucket/prefix")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Maximum number of uploads in flight")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Number of video rows per INSERT")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Mark ingested videos as queued for transcription")
+    parser.add_argument("--created-by", default=None,
+                        help="Value stored in Video.created_by")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    setup_logging()
+    args = parse_args(argv)
+    s3_service = S3Service()
+
+    if args.source.startswith("s3://"):
+        items = list(scan_s3_prefix(s3_service, args.source))
+    else:
+        root = Path(args.source)
+        if not root.is_dir():
+            logger.error(f"Source directory not found: {root}")
+            return 1
+        items = list(scan_directory(root))
+
+    ingestor = BulkIngestor(
+        s3_service,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        enqueue=args.enqueue,
+        created_by=args.created_by
+    )
+    try:
+        asyncio.run(ingestor.run(items))
+    except KeyboardInterrupt:
+        logger.warning("Ingest interrupted; rerun the same command to resume")
+        return 130
+    return 0 if ingestor.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
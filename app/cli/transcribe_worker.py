@@ -0,0 +1,197 @@
+"""
+Worker that transcribes queued videos in batches.
+
+Usage:
+    python -m app.cli.transcribe_worker
+    python -m app.cli.transcribe_worker --once --batch-size 16
+
+Each iteration claims up to --claim queued videos (for example those
+registered with `python -m app.cli.ingest --enqueue`) and decodes the clips
+under 30 seconds together. Videos found to be longer are handed back to the
+queue with their duration recorded, and are then claimed and transcribed one
+at a time, one per iteration. Everything is finished with NLP analysis and
+timelines.
+
+While a worker holds videos, a background thread renews their lease every
+quarter of TRANSCRIPTION_LEASE_SECONDS. Videos whose lease has run out
+because their worker died are reclaimed. Failed videos are requeued until
+they have used TRANSCRIPTION_MAX_ATTEMPTS.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from whisper.audio import CHUNK_LENGTH
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.crud.video import VideoRepository
+from app.db.session import SessionLocal
+from app.models.video import ProcessingStatus
+from app.services.nlp import NLPService
+from app.services.pipeline import complete_transcription
+from app.services.transcription import DeferredVideo, TranscriptionError, TranscriptionService
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseHeartbeat:
+    """
+    Keeps renewing the processing lease of claimed videos from a background
+    thread, so it keeps running while Whisper blocks the event loop
+    """
+
+    def __init__(self, video_ids: List[int], interval: float):
+        self.video_ids = set(video_ids)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def release(self, video_id: int) -> None:
+        with self._lock:
+            self.video_ids.discard(video_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                video_ids = list(self.video_ids)
+            db = SessionLocal()
+            try:
+                asyncio.run(VideoRepository.heartbeat(db, video_ids))
+            except Exception as e:
+                logger.warning(f"Failed to renew lease of videos {video_ids}: {str(e)}")
+            finally:
+                db.close()
+
+
+async def process_round(
+        transcription_service: TranscriptionService,
+        nlp_service: NLPService,
+        claim: int,
+        batch_size: int,
+        long_videos: bool = False
+) -> int:
+    """
+    Claim and process one round of queued videos, returning how many were
+    claimed. Short rounds batch clips and hand long videos back; long rounds
+    transcribe a single long video.
+    """
+    db = SessionLocal()
+    try:
+        videos = await VideoRepository.claim_queued(
+            db,
+            1 if long_videos else claim,
+            lease_seconds=settings.TRANSCRIPTION_LEASE_SECONDS,
+            max_attempts=settings.TRANSCRIPTION_MAX_ATTEMPTS,
+            long_after=CHUNK_LENGTH,
+            long_videos=long_videos
+        )
+        if not videos:
+            return 0
+
+        started = time.monotonic()
+        video_ids = [video.id for video in videos]
+        s3_urls = [video.s3_url for video in videos]
+
+        failed = 0
+        retried = 0
+        deferred = 0
+        with LeaseHeartbeat(video_ids, settings.TRANSCRIPTION_LEASE_SECONDS / 4) as lease:
+            results = await transcription_service.process_videos(
+                s3_urls, batch_size=batch_size, transcribe_long=long_videos
+            )
+
+            for video_id, result in zip(video_ids, results):
+                try:
+                    if isinstance(result, DeferredVideo):
+                        await VideoRepository.requeue(db, video_id, result.duration)
+                        deferred += 1
+                        continue
+                    if isinstance(result, TranscriptionError):
+                        raise result
+                    await complete_transcription(db, nlp_service, video_id, result)
+                except Exception as e:
+                    logger.error(f"Error transcribing video {video_id}: {str(e)}")
+                    db.rollback()
+                    status = await VideoRepository.retry_or_fail(
+                        db, video_id, str(e), settings.TRANSCRIPTION_MAX_ATTEMPTS
+                    )
+                    if status == ProcessingStatus.QUEUED:
+                        retried += 1
+                    else:
+                        failed += 1
+                finally:
+                    lease.release(video_id)
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Processed {len(video_ids)} {'long ' if long_videos else ''}videos "
+            f"({failed} failed, {retried} requeued, {deferred} deferred as long) "
+            f"in {elapsed:.1f}s, "
+            f"{len(video_ids) / max(elapsed, 1e-9):.2f} videos/sec"
+        )
+        return len(video_ids)
+    finally:
+        db.close()
+
+
+async def run(args: argparse.Namespace) -> None:
+    transcription_service = TranscriptionService()
+    nlp_service = NLPService()
+
+    while True:
+        # Alternate a batch of short clips with one long video so neither
+        # kind starves the other
+        claimed = await process_round(
+            transcription_service, nlp_service, args.claim, args.batch_size
+        )
+        claimed += await process_round(
+            transcription_service, nlp_service, args.claim, args.batch_size,
+            long_videos=True
+        )
+        if claimed:
+            continue
+        if args.once:
+            logger.info("Queue drained")
+            return
+        await asyncio.sleep(args.poll_interval)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Transcribe queued videos in batches")
+    parser.add_argument("--batch-size", type=int, default=settings.TRANSCRIPTION_BATCH_SIZE,
+                        help="Short clips decoded per model pass")
+    parser.add_argument("--claim", type=int, default=32,
+                        help="Queued short videos claimed per round")
+    parser.add_argument("--poll-interval", type=float, default=10.0,
+                        help="Seconds to wait when the queue is empty")
+    parser.add_argument("--once", action="store_true",
+                        help="Exit once the queue is empty")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    setup_logging()
+    args = parse_args(argv)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        logger.warning("Worker stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
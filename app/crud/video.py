@@ -1,7 +1,8 @@
+from sqlalchemy import and_, func, insert, or_, true
 from sqlalchemy.orm import Session
 from app.models.video import Video, ProcessingStatus
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
 
 class VideoRepository:
     @staticmethod
@@ -23,18 +24,199 @@ class VideoRepository:
         db.refresh(video)
         return video
 
+    @staticmethod
+    async def create_videos(
+        db: Session,
+        videos: List[Dict[str, str]],
+        status: ProcessingStatus = ProcessingStatus.UPLOADED,
+        created_by: Optional[str] = None
+    ) -> List[int]:
+        """
+        Insert many videos in a single multi-row INSERT and commit once.
+        Each entry needs "filename" and "s3_url". Returns the new ids.
+        """
+        if not videos:
+            return []
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "filename": video["filename"],
+                "s3_url": video["s3_url"],
+                "status": status,
+                "upload_time": now,
+                "last_modified": now,
+                "created_by": created_by
+            }
+            for video in videos
+        ]
+        result = db.execute(insert(Video).values(rows).returning(Video.id))
+        ids = [row[0] for row in result]
+        db.commit()
+        return ids
+
+    @staticmethod
+    async def existing_s3_urls(db: Session, s3_urls: Iterable[str]) -> Set[str]:
+        """
+        Return the subset of s3_urls that already have a video record
+        """
+        s3_urls = list(s3_urls)
+        if not s3_urls:
+            return set()
+        rows = db.query(Video.s3_url).filter(Video.s3_url.in_(s3_urls)).all()
+        return {row[0] for row in rows}
+
     @staticmethod
     async def update_transcription(
             db: Session,
             video_id: int,
-            transcription_details: dict
+            transcription_details: dict,
+            timeline: Optional[dict] = None
     ) -> Optional[Video]:
         video = db.query(Video).filter(Video.id == video_id).first()
         if video:
             video.transcription = transcription_details["text"]  # Keep original field
             video.transcription_details = transcription_details  # Add detailed data
+            video.timeline = timeline
             video.status = ProcessingStatus.COMPLETED
             video.processed_time = datetime.utcnow()
             db.commit()
             db.refresh(video)
-        return video
\ No newline at end of file
+        return video
+
+    @staticmethod
+    async def claim_queued(
+        db: Session,
+        limit: int,
+        lease_seconds: int,
+        max_attempts: int,
+        long_after: Optional[float] = None,
+        long_videos: bool = False
+    ) -> List[Video]:
+        """
+        Atomically move up to limit videos to processing, skipping rows another
+        worker has already locked. Besides queued videos this reclaims videos
+        whose processing lease (last_modified, renewed by heartbeat) is older
+        than lease_seconds because their worker died; those that already used
+        max_attempts are marked failed instead.
+
+        With long_after set, only videos whose recorded duration exceeds it
+        (long_videos=True) or that are shorter or not yet measured
+        (long_videos=False) are claimed.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        stale = and_(
+            Video.status == ProcessingStatus.PROCESSING,
+            Video.last_modified < stale_before
+        )
+        attempts = func.coalesce(Video.processing_attempts, 0)
+        duration = Video.video_metadata["duration"].as_float()
+        if long_after is None:
+            duration_filter = true()
+        elif long_videos:
+            duration_filter = duration > long_after
+        else:
+            duration_filter = or_(duration.is_(None), duration <= long_after)
+
+        db.query(Video).filter(stale, attempts >= max_attempts).update(
+            {
+                Video.status: ProcessingStatus.FAILED,
+                Video.error_message: f"Abandoned after {max_attempts} processing attempts"
+            },
+            synchronize_session=False
+        )
+
+        videos = (
+            db.query(Video)
+            .filter(or_(Video.status == ProcessingStatus.QUEUED, stale))
+            .filter(attempts < max_attempts)
+            .filter(duration_filter)
+            .order_by(Video.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for video in videos:
+            video.status = ProcessingStatus.PROCESSING
+            video.processing_attempts = (video.processing_attempts or 0) + 1
+        db.commit()
+        return videos
+
+    @staticmethod
+    async def claim_videos(db: Session, video_ids: List[int]) -> List[Video]:
+        """
+        Move the given videos to processing unless they are already being
+        processed or are locked by a worker. Returns the videos claimed.
+        """
+        videos = (
+            db.query(Video)
+            .filter(
+                Video.id.in_(video_ids),
+                Video.status != ProcessingStatus.PROCESSING
+            )
+            .order_by(Video.id)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for video in videos:
+            video.status = ProcessingStatus.PROCESSING
+            video.processing_attempts = (video.processing_attempts or 0) + 1
+        db.commit()
+        return videos
+
+    @staticmethod
+    async def requeue(db: Session, video_id: int, duration: Optional[float] = None) -> None:
+        """
+        Hand a claimed video to the transcription queue without counting the
+        claim as a processing attempt. A known duration is kept in
+        video_metadata so workers can tell long videos apart when claiming.
+        """
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if video:
+            video.status = ProcessingStatus.QUEUED
+            video.processing_attempts = max((video.processing_attempts or 0) - 1, 0)
+            if duration is not None:
+                video.video_metadata = {**(video.video_metadata or {}), "duration": duration}
+            db.commit()
+
+    @staticmethod
+    async def heartbeat(db: Session, video_ids: List[int]) -> None:
+        """
+        Renew the processing lease of videos a worker is still working on
+        """
+        if not video_ids:
+            return
+        db.query(Video).filter(
+            Video.id.in_(video_ids),
+            Video.status == ProcessingStatus.PROCESSING
+        ).update({Video.last_modified: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    async def retry_or_fail(
+        db: Session,
+        video_id: int,
+        error_message: str,
+        max_attempts: int
+    ) -> ProcessingStatus:
+        """
+        Requeue a failed video while it has attempts left, otherwise mark it failed
+        """
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if not video:
+            return ProcessingStatus.FAILED
+        video.error_message = error_message
+        if (video.processing_attempts or 0) < max_attempts:
+            video.status = ProcessingStatus.QUEUED
+        else:
+            video.status = ProcessingStatus.FAILED
+        db.commit()
+        return video.status
+
+    @staticmethod
+    async def mark_failed(db: Session, video_id: int, error_message: str) -> None:
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if video:
+            video.status = ProcessingStatus.FAILED
+            video.error_message = error_message
+            db.commit()
\ No newline at end of file
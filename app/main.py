@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.routes import videos
 from app.core.logging import setup_logging
+from app.api.encoding import response_size_metrics
+from app.services.nlp_cache import get_nlp_cache
 
 setup_logging()
 
@@ -32,4 +34,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "response_sizes": response_size_metrics.snapshot(),
+        "nlp_cache": get_nlp_cache().stats()
+    }
\ No newline at end of file
@@ -83,6 +83,9 @@ class Video(Base):
     }
     """
 
+    # Precomputed sentiment/entity aggregates, see app.services.timeline
+    timeline = Column(JSONB, nullable=True)
+
     def __repr__(self):
         """String representation of the Video model"""
         return f"<Video(id={self.id}, filename='{self.filename}', status='{self.status}')>"
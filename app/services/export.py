@@ -0,0 +1,92 @@
+import enum
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+
+class ExportFormat(str, enum.Enum):
+    """
+    Transcript export formats supported by the export endpoint
+    """
+    SRT = "srt"
+    VTT = "vtt"
+    JSONL = "jsonl"
+    TXT = "txt"
+
+
+MEDIA_TYPES = {
+    ExportFormat.SRT: "application/x-subrip",
+    ExportFormat.VTT: "text/vtt; charset=utf-8",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.TXT: "text/plain; charset=utf-8",
+}
+
+
+def format_timestamp(seconds: float, separator: str) -> str:
+    """
+    Format seconds as HH:MM:SS<separator>mmm
+    """
+    milliseconds = int(round(max(seconds, 0.0) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def _cues(segments: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Segments that have text to show; a cue without a payload line is
+    malformed in both SRT and WebVTT
+    """
+    for segment in segments:
+        text = segment["text"].strip()
+        if text:
+            yield {**segment, "text": text}
+
+
+def _srt(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for index, segment in enumerate(_cues(segments), start=1):
+        yield (
+            f"{index}\n"
+            f"{format_timestamp(segment['start'], ',')} --> "
+            f"{format_timestamp(segment['end'], ',')}\n"
+            f"{segment['text']}\n\n"
+        )
+
+
+def _vtt(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    yield "WEBVTT\n\n"
+    for segment in _cues(segments):
+        yield (
+            f"{format_timestamp(segment['start'], '.')} --> "
+            f"{format_timestamp(segment['end'], '.')}\n"
+            f"{segment['text']}\n\n"
+        )
+
+
+def _jsonl(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for segment in segments:
+        yield json.dumps(segment, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _txt(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for segment in segments:
+        yield segment["text"].strip() + "\n"
+
+
+_WRITERS = {
+    ExportFormat.SRT: _srt,
+    ExportFormat.VTT: _vtt,
+    ExportFormat.JSONL: _jsonl,
+    ExportFormat.TXT: _txt,
+}
+
+
+def export_segments(
+        segments: Iterable[Dict[str, Any]],
+        export_format: ExportFormat
+) -> Iterator[str]:
+    """
+    Render segments lazily, one chunk per segment, so output of any length
+    can be streamed without building it in memory
+    """
+    return _WRITERS[export_format](segments)
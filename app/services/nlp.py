@@ -1,10 +1,16 @@
 import spacy
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import logging
+from importlib import metadata
 from typing import Dict, Any, List
+from app.services.nlp_cache import get_nlp_cache
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the shape or content of analyze_text output changes so that
+# cached results from older code are not served
+ANALYSIS_VERSION = "1"
+
 
 class NLPService:
     def __init__(self):
@@ -12,14 +18,53 @@ class NLPService:
             logger.info("Initializing NLP models...")
             self.nlp = spacy.load("en_core_web_sm")
             self.sentiment_analyzer = SentimentIntensityAnalyzer()
+            self.cache = get_nlp_cache()
+            self.pipeline_version = self._pipeline_version()
             logger.info("NLP models initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing NLP models: {e}")
             raise
 
+    def _pipeline_version(self) -> str:
+        try:
+            vader_version = metadata.version("vaderSentiment")
+        except metadata.PackageNotFoundError:
+            vader_version = "unknown"
+        meta = self.nlp.meta
+        return (
+            f"{ANALYSIS_VERSION}:{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}"
+            f":spacy-{spacy.__version__}:vader-{vader_version}"
+        )
+
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """
-        Perform comprehensive NLP analysis on text
+        Perform comprehensive NLP analysis on text, reusing cached results
+        for text that has been analyzed before
+        """
+        # Whisper segments usually carry a leading space; analyze the stripped
+        # text so " Thank you." and "Thank you." share one cache entry, then
+        # shift entity offsets back onto the original string
+        normalized = text.strip()
+        offset = len(text) - len(text.lstrip())
+
+        if self.cache.cacheable(normalized):
+            key = self.cache.make_key(normalized, self.pipeline_version)
+            analysis = self.cache.get(key)
+            if analysis is None:
+                analysis = self._analyze(normalized)
+                self.cache.put(key, analysis)
+        else:
+            analysis = self._analyze(normalized)
+
+        if offset:
+            for entity in analysis["entities"]:
+                entity["start"] += offset
+                entity["end"] += offset
+        return analysis
+
+    def _analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Run VADER and spaCy on text
         """
         try:
             # VADER Sentiment Analysis
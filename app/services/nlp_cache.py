@@ -0,0 +1,233 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Puts between checks of the disk tier's row count
+DISK_PRUNE_INTERVAL = 1000
+# Fraction of max_disk_rows kept after pruning, so pruning is not run on every put
+DISK_PRUNE_TARGET = 0.9
+# Seconds a reader waits for another process's write lock before giving up
+DISK_TIMEOUT_SECONDS = 1.0
+# Disk hits only rewrite a row's access time once it is older than this
+DISK_ACCESS_REFRESH_SECONDS = 3600
+
+
+class NLPCache:
+    """
+    Two-tier memoization cache for NLP analysis results.
+
+    The first tier is an in-process LRU bounded by the encoded size of the
+    cached results. The optional second tier is a SQLite file that can be
+    shared by every worker on a host and survives restarts; it is capped at
+    max_disk_rows and drops the least recently used rows beyond that. Values
+    are kept JSON-encoded so callers always get a fresh copy they are free
+    to mutate.
+
+    Only text up to max_text_length characters is cached. Repeats come from
+    short segment text; full transcripts are unique and large, and caching
+    them would only push reusable entries out.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int,
+            max_text_length: int,
+            disk_path: Optional[str] = None,
+            max_disk_rows: int = 0
+    ):
+        self.max_bytes = max_bytes
+        self.max_text_length = max_text_length
+        self.max_disk_rows = max_disk_rows
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes use of the shared SQLite connection
+        self._disk_lock = threading.Lock()
+        self._puts_since_prune = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.bypassed = 0
+
+        self._disk = None
+        if disk_path:
+            try:
+                self._disk = sqlite3.connect(
+                    disk_path, timeout=DISK_TIMEOUT_SECONDS, check_same_thread=False
+                )
+                self._disk.execute("PRAGMA journal_mode=WAL")
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS nlp_cache "
+                    "(key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._disk.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_nlp_cache_accessed ON nlp_cache (accessed)"
+                )
+                self._disk.commit()
+                logger.info(f"NLP disk cache enabled at {disk_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"NLP disk cache unavailable, using memory only: {e}")
+                self._disk = None
+
+    @staticmethod
+    def make_key(text: str, version: str) -> str:
+        return hashlib.sha256(f"{version}\0{text}".encode("utf-8")).hexdigest()
+
+    def cacheable(self, text: str) -> bool:
+        """
+        Whether text is short enough to be worth caching; counts bypasses
+        """
+        if len(text) <= self.max_text_length:
+            return True
+        with self._lock:
+            self.bypassed += 1
+        return False
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(encoded)
+
+        # Disk I/O happens outside self._lock so memory hits never wait on SQLite
+        encoded = self._disk_get(key) if self._disk is not None else None
+
+        with self._lock:
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, encoded)
+        return json.loads(encoded)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        encoded = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._store(key, encoded)
+        if self._disk is not None:
+            self._disk_put(key, encoded)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        with self._disk_lock:
+            try:
+                row = self._disk.execute(
+                    "SELECT value, accessed FROM nlp_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+            except sqlite3.Error as e:
+                logger.warning(f"NLP disk cache read failed: {e}")
+                return None
+
+            # Only refresh the LRU timestamp occasionally; writing on every
+            # hit would take the file's write lock on the read path
+            now = time.time()
+            if now - row[1] > DISK_ACCESS_REFRESH_SECONDS:
+                try:
+                    self._disk.execute(
+                        "UPDATE nlp_cache SET accessed = ? WHERE key = ?", (now, key)
+                    )
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"NLP disk cache access time update failed: {e}")
+            return row[0]
+
+    def _disk_put(self, key: str, encoded: bytes) -> None:
+        with self._disk_lock:
+            try:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO nlp_cache (key, value, accessed) "
+                    "VALUES (?, ?, ?)",
+                    (key, encoded, time.time())
+                )
+                self._disk.commit()
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= DISK_PRUNE_INTERVAL:
+                    self._prune_disk()
+            except sqlite3.Error as e:
+                logger.warning(f"NLP disk cache write failed: {e}")
+
+    def _store(self, key: str, encoded: bytes) -> None:
+        # Results larger than the whole budget would only flush the cache
+        if len(encoded) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= len(previous)
+        self._entries[key] = encoded
+        self.current_bytes += len(encoded)
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _prune_disk(self) -> None:
+        """
+        Drop least recently used rows once the disk tier exceeds max_disk_rows.
+        Counted against the shared file, so rows written by other workers are
+        included. Called with self._disk_lock held.
+        """
+        self._puts_since_prune = 0
+        if self.max_disk_rows <= 0:
+            return
+        rows = self._disk.execute("SELECT COUNT(*) FROM nlp_cache").fetchone()[0]
+        if rows <= self.max_disk_rows:
+            return
+        excess = rows - int(self.max_disk_rows * DISK_PRUNE_TARGET)
+        deleted = self._disk.execute(
+            "DELETE FROM nlp_cache WHERE key IN "
+            "(SELECT key FROM nlp_cache ORDER BY accessed LIMIT ?)",
+            (excess,)
+        ).rowcount
+        self._disk.commit()
+        with self._lock:
+            self.disk_evictions += deleted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "bypassed": self.bypassed,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": self._disk is not None
+            }
+
+
+_cache: Optional[NLPCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_nlp_cache() -> NLPCache:
+    """
+    Process-wide cache shared by every NLPService instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = NLPCache(
+                max_bytes=settings.NLP_CACHE_MAX_BYTES,
+                max_text_length=settings.NLP_CACHE_MAX_TEXT_LENGTH,
+                disk_path=settings.NLP_CACHE_PATH,
+                max_disk_rows=settings.NLP_CACHE_DISK_MAX_ROWS
+            )
+        return _cache
@@ -0,0 +1,30 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.crud.video import VideoRepository
+from app.models.video import Video
+from app.services.nlp import NLPService
+from app.services.timeline import build_timeline
+
+
+async def complete_transcription(
+        db: Session,
+        nlp_service: NLPService,
+        video_id: int,
+        transcription_details: dict
+) -> Optional[Video]:
+    """
+    Run NLP analysis and timeline aggregation on a fresh transcription and
+    store everything on the video
+    """
+    full_text_analysis = nlp_service.analyze_text(transcription_details["text"])
+    segment_analysis = nlp_service.analyze_segments(transcription_details["segments"])
+
+    transcription_details["analysis"] = {
+        "full_text": full_text_analysis,
+        "segments": segment_analysis
+    }
+    timeline = build_timeline(segment_analysis)
+
+    return await VideoRepository.update_transcription(
+        db, video_id, transcription_details, timeline
+    )
@@ -1,8 +1,10 @@
+import asyncio
 import boto3
 from botocore.exceptions import ClientError
 from app.core.config import settings
 import logging
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
 from fastapi import UploadFile
 
 logger = logging.getLogger(__name__)
@@ -33,12 +35,103 @@ class S3Service:
                 ContentType=file.content_type
             )
 
-            url = f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{object_key}"
-            return url
+            return self.object_url(object_key)
 
         except ClientError as e:
             logger.error(f"Error uploading file to S3: {str(e)}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error during S3 upload: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    def object_url(self, object_key: str) -> str:
+        """
+        Build the public URL stored on Video.s3_url for an object in our bucket
+        """
+        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{object_key}"
+
+    async def upload_path(
+            self,
+            path: Path,
+            object_key: str,
+            content_type: str
+    ) -> Optional[str]:
+        """
+        Upload a local file to S3 without reading it into memory and return its URL
+        """
+        try:
+            # upload_file streams from disk (multipart for large files); run it
+            # in a worker thread so several uploads can proceed concurrently
+            await asyncio.to_thread(
+                self.s3_client.upload_file,
+                str(path),
+                self.bucket_name,
+                object_key,
+                ExtraArgs={"ContentType": content_type}
+            )
+            return self.object_url(object_key)
+
+        except ClientError as e:
+            logger.error(f"Error uploading {path} to S3: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error uploading {path} to S3: {str(e)}")
+            return None
+
+    async def copy_object(
+            self,
+            source_bucket: str,
+            source_key: str,
+            object_key: str,
+            content_type: str
+    ) -> Optional[str]:
+        """
+        Server-side copy of an object from another bucket into ours and return its URL
+        """
+        try:
+            await asyncio.to_thread(
+                self.s3_client.copy,
+                {"Bucket": source_bucket, "Key": source_key},
+                self.bucket_name,
+                object_key,
+                ExtraArgs={"ContentType": content_type, "MetadataDirective": "REPLACE"}
+            )
+            return self.object_url(object_key)
+
+        except ClientError as e:
+            logger.error(f"Error copying s3://{source_bucket}/{source_key}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error copying s3://{source_bucket}/{source_key}: {str(e)}")
+            return None
+
+    async def ensure_video_content_type(self, object_key: str, content_type: str) -> Optional[str]:
+        """
+        Make sure an object in our bucket is stored with a video/* ContentType,
+        rewriting its metadata in place if not, and return its URL
+        """
+        try:
+            head = await asyncio.to_thread(
+                self.s3_client.head_object, Bucket=self.bucket_name, Key=object_key
+            )
+        except ClientError as e:
+            logger.error(f"Error reading metadata of {object_key}: {str(e)}")
+            return None
+        if head.get("ContentType", "").startswith("video/"):
+            return self.object_url(object_key)
+
+        logger.info(
+            f"Fixing ContentType of {object_key}: {head.get('ContentType')} -> {content_type}"
+        )
+        # Copying an object onto itself with REPLACE only rewrites its metadata
+        return await self.copy_object(self.bucket_name, object_key, object_key, content_type)
+
+    def list_objects(self, bucket: str, prefix: str) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (key, etag) for every object under a prefix, following pagination
+        """
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith("/"):
+                    yield obj["Key"], obj["ETag"].strip('"')
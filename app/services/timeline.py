@@ -0,0 +1,161 @@
+import math
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bucket widths in seconds precomputed for every analyzed video
+TIMELINE_RESOLUTIONS = (10, 60, 300)
+TIMELINE_VERSION = 1
+
+
+def _integrate(
+        starts: np.ndarray,
+        ends: np.ndarray,
+        values: np.ndarray,
+        boundaries: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluate F(t) = sum_i values[i] * |[starts[i], ends[i]) ∩ [0, t)| at each
+    boundary. F is piecewise linear with breakpoints at segment edges, so it
+    is computed exactly at the breakpoints and interpolated in between.
+    """
+    times = np.concatenate([starts, ends])
+    slopes = np.concatenate([values, -values])
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    slope_after = np.cumsum(slopes[order])
+    at_events = np.concatenate([[0.0], np.cumsum(slope_after[:-1] * np.diff(times))])
+    return np.interp(boundaries, times, at_events)
+
+
+def _sentiment_buckets(
+        starts: np.ndarray,
+        ends: np.ndarray,
+        compound: np.ndarray,
+        boundaries: np.ndarray
+) -> List:
+    """
+    Duration-weighted mean compound sentiment per bucket, None where no
+    speech overlaps the bucket
+    """
+    weighted = np.diff(_integrate(starts, ends, compound, boundaries))
+    coverage = np.diff(_integrate(starts, ends, np.ones_like(compound), boundaries))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.round(weighted / coverage, 4)
+    return [
+        float(mean) if covered > 1e-9 else None
+        for mean, covered in zip(means, coverage)
+    ]
+
+
+def _entity_buckets(
+        times: np.ndarray,
+        labels: Sequence[str],
+        bucket_seconds: int,
+        n_buckets: int
+) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Entity mention counts per label and bucket, stored sparsely as parallel
+    lists of bucket indexes and counts
+    """
+    if len(labels) == 0:
+        return {}
+    names, label_index = np.unique(np.asarray(labels), return_inverse=True)
+    buckets = np.minimum((times // bucket_seconds).astype(np.int64), n_buckets - 1)
+    counts = np.bincount(
+        label_index * n_buckets + buckets,
+        minlength=len(names) * n_buckets
+    ).reshape(len(names), n_buckets)
+
+    result = {}
+    for name, row in zip(names, counts):
+        nonzero = np.flatnonzero(row)
+        result[str(name)] = {
+            "index": nonzero.tolist(),
+            "count": row[nonzero].tolist()
+        }
+    return result
+
+
+def _segment_arrays(
+        segments: List[Dict[str, Any]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    starts, ends, compound = [], [], []
+    entity_times, entity_labels = [], []
+
+    for segment in segments:
+        start, end = float(segment["start"]), float(segment["end"])
+        analysis = segment.get("nlp_analysis") or {}
+        if end > start:
+            starts.append(start)
+            ends.append(end)
+            compound.append(analysis.get("sentiment", {}).get("compound", 0.0))
+
+        # Place each mention proportionally to its character offset
+        text_length = max(len(segment.get("text", "")), 1)
+        for entity in analysis.get("entities", []):
+            fraction = min(max(entity["start"] / text_length, 0.0), 1.0)
+            entity_times.append(start + fraction * max(end - start, 0.0))
+            entity_labels.append(entity["label"])
+
+    return (
+        np.asarray(starts, dtype=np.float64),
+        np.asarray(ends, dtype=np.float64),
+        np.asarray(compound, dtype=np.float64),
+        np.asarray(entity_times, dtype=np.float64),
+        entity_labels
+    )
+
+
+def build_timeline(
+        segments: List[Dict[str, Any]],
+        resolutions: Sequence[int] = TIMELINE_RESOLUTIONS
+) -> Dict[str, Any]:
+    """
+    Aggregate analyzed segments into fixed-width buckets at each resolution.
+
+    Structure:
+    {
+        "version": 1,
+        "duration": 754.2,
+        "resolutions": {
+            "60": {
+                "bucket_seconds": 60,
+                "buckets": 13,
+                "sentiment": [0.41, -0.05, null, ...],
+                "entities": {"PERSON": {"index": [0, 4], "count": [3, 1]}}
+            }
+        }
+    }
+    """
+    starts, ends, compound, entity_times, entity_labels = _segment_arrays(segments)
+    # Include zero-length segments so their entities land in their own bucket
+    duration = max((float(segment["end"]) for segment in segments), default=0.0)
+
+    timeline = {
+        "version": TIMELINE_VERSION,
+        "duration": duration,
+        "resolutions": {}
+    }
+    for bucket_seconds in resolutions:
+        n_buckets = max(math.ceil(duration / bucket_seconds), 1)
+        boundaries = np.arange(n_buckets + 1, dtype=np.float64) * bucket_seconds
+
+        if len(starts):
+            sentiment = _sentiment_buckets(starts, ends, compound, boundaries)
+        else:
+            sentiment = [None] * n_buckets
+
+        timeline["resolutions"][str(bucket_seconds)] = {
+            "bucket_seconds": bucket_seconds,
+            "buckets": n_buckets,
+            "sentiment": sentiment,
+            "entities": _entity_buckets(
+                entity_times, entity_labels, bucket_seconds, n_buckets
+            )
+        }
+
+    return timeline
@@ -1,21 +1,42 @@
 import whisper
+import torch
+import numpy as np
 import logging
 from pathlib import Path
 import tempfile
 import boto3
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple, Union
 import os
+import re
+import subprocess
+from whisper.audio import CHUNK_LENGTH, SAMPLE_RATE
+from whisper.tokenizer import get_tokenizer
 from app.core.config import settings
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# Seconds per Whisper timestamp token
+TIME_PRECISION = 0.02
+# Same thresholds Whisper's transcribe() uses to drop silent windows
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
 
 class TranscriptionError(Exception):
     """Custom exception for transcription-related errors"""
     pass
 
 
+class DeferredVideo:
+    """Result for a long video that process_videos was told not to transcribe"""
+
+    def __init__(self, duration: float):
+        self.duration = duration
+
+
 class TranscriptionService:
     def __init__(self):
         try:
@@ -72,9 +93,10 @@ class TranscriptionService:
             logger.error(f"Unexpected error downloading video: {str(e)}")
             raise TranscriptionError(f"Download failed: {str(e)}")
 
-    async def transcribe_video(self, video_path: Path) -> dict:
+    async def transcribe_video(self, video_path: Path, audio: Optional[np.ndarray] = None) -> dict:
         """
-        Transcribe video file using Whisper with detailed output
+        Transcribe video file using Whisper with detailed output.
+        Pass audio when it has already been decoded to avoid decoding twice.
         """
         try:
             logger.info(f"Starting transcription for {video_path}")
@@ -84,7 +106,7 @@ class TranscriptionService:
 
             # Use Whisper with word timestamps
             result = self.model.transcribe(
-                str(video_path),
+                audio if audio is not None else str(video_path),
                 word_timestamps=True,
                 verbose=True
             )
@@ -122,6 +144,190 @@ class TranscriptionService:
         except Exception as e:
             logger.warning(f"Failed to cleanup temp file {temp_path}: {str(e)}")
 
+    def load_clip(self, video_path: Path) -> np.ndarray:
+        """
+        Decode a video's audio track to 16kHz mono samples
+        """
+        try:
+            return whisper.load_audio(str(video_path))
+        except Exception as e:
+            raise TranscriptionError(f"Audio decoding failed: {str(e)}")
+
+    def probe_duration(self, video_path: Path) -> Optional[float]:
+        """
+        Read a video's duration from its container header without decoding
+        the audio. Returns None when ffmpeg does not report one.
+        """
+        try:
+            probe = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-nostdin", "-i", str(video_path)],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Failed to probe {video_path}: {str(e)}")
+            return None
+        # ffmpeg exits non-zero without an output file but still prints the header
+        match = DURATION_PATTERN.search(probe.stderr)
+        if not match:
+            return None
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    def is_short_clip(self, audio: np.ndarray) -> bool:
+        """
+        Whether a clip fits in a single Whisper window and can be batched
+        """
+        return len(audio) <= CHUNK_LENGTH * SAMPLE_RATE
+
+    def _segments_from_tokens(self, tokens: List[int], tokenizer, duration: float) -> List[dict]:
+        """
+        Split decoded tokens into segments on timestamp tokens
+        """
+        segments = []
+        start = 0.0
+        text_tokens = []
+
+        for token in tokens:
+            if token < tokenizer.timestamp_begin:
+                text_tokens.append(token)
+                continue
+            time = min((token - tokenizer.timestamp_begin) * TIME_PRECISION, duration)
+            if text_tokens:
+                segments.append((start, time, text_tokens))
+                text_tokens = []
+            start = time
+
+        if text_tokens:
+            segments.append((start, duration, text_tokens))
+
+        return [
+            {
+                "start": round(seg_start, 2),
+                "end": round(max(seg_end, seg_start), 2),
+                "text": tokenizer.decode(seg_tokens),
+                "confidence": 0.0,
+                # Word alignment needs a per-clip pass, which batching avoids
+                "words": []
+            }
+            for seg_start, seg_end, seg_tokens in segments
+        ]
+
+    async def transcribe_batch(self, audios: List[np.ndarray]) -> List[dict]:
+        """
+        Transcribe several short clips with one batched encoder/decoder pass.
+        Every clip must fit in a single 30s window (see is_short_clip).
+        Results have the same structure as transcribe_video, without
+        word-level timestamps.
+        """
+        try:
+            logger.info(f"Starting batched transcription of {len(audios)} clips")
+
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(audio)),
+                    self.model.dims.n_mels
+                )
+                for audio in audios
+            ]).to(self.model.device)
+
+            options = whisper.DecodingOptions(
+                task="transcribe",
+                without_timestamps=False,
+                fp16=self.model.device.type == "cuda"
+            )
+            results = whisper.decode(self.model, mels, options)
+
+            transcriptions = []
+            for audio, result in zip(audios, results):
+                if (result.no_speech_prob > NO_SPEECH_THRESHOLD
+                        and result.avg_logprob < LOGPROB_THRESHOLD):
+                    transcriptions.append({"text": "", "segments": []})
+                    continue
+
+                tokenizer = get_tokenizer(
+                    self.model.is_multilingual,
+                    num_languages=self.model.num_languages,
+                    language=result.language,
+                    task="transcribe"
+                )
+                transcriptions.append({
+                    "text": result.text,
+                    "segments": self._segments_from_tokens(
+                        result.tokens, tokenizer, len(audio) / SAMPLE_RATE
+                    )
+                })
+
+            logger.info("Batched transcription completed successfully")
+            return transcriptions
+
+        except Exception as e:
+            logger.error(f"Error during batched transcription: {str(e)}")
+            raise TranscriptionError(f"Batched transcription failed: {str(e)}")
+
+    async def process_videos(
+            self,
+            s3_urls: List[str],
+            batch_size: int = settings.TRANSCRIPTION_BATCH_SIZE,
+            transcribe_long: bool = True
+    ) -> List[Union[dict, TranscriptionError, DeferredVideo]]:
+        """
+        Download and transcribe many videos. Clips under 30 seconds are
+        decoded together in batches of batch_size. Longer videos go through
+        transcribe_video one at a time, or are skipped when transcribe_long
+        is False. Returns one entry per URL: the transcription details, the
+        TranscriptionError it failed with, or a DeferredVideo carrying the
+        duration of a skipped long video.
+        """
+        results: List[Union[dict, TranscriptionError, DeferredVideo]] = [None] * len(s3_urls)
+        short_clips: List[Tuple[int, np.ndarray]] = []
+        temp_paths = []
+
+        try:
+            for index, s3_url in enumerate(s3_urls):
+                try:
+                    temp_path, content_type = await self.download_from_s3(s3_url)
+                    temp_paths.append(temp_path)
+                    if not content_type.startswith('video/'):
+                        raise TranscriptionError(f"Invalid content type: {content_type}")
+
+                    # Check the container duration first so long videos are
+                    # not decoded here only to be decoded again by Whisper
+                    duration = self.probe_duration(temp_path)
+                    if duration is not None and duration > CHUNK_LENGTH:
+                        if transcribe_long:
+                            results[index] = await self.transcribe_video(temp_path)
+                        else:
+                            results[index] = DeferredVideo(duration)
+                        continue
+
+                    audio = self.load_clip(temp_path)
+                    if self.is_short_clip(audio):
+                        short_clips.append((index, audio))
+                    elif transcribe_long:
+                        results[index] = await self.transcribe_video(temp_path, audio=audio)
+                    else:
+                        results[index] = DeferredVideo(len(audio) / SAMPLE_RATE)
+                except TranscriptionError as e:
+                    results[index] = e
+
+            for start in range(0, len(short_clips), batch_size):
+                batch = short_clips[start:start + batch_size]
+                try:
+                    transcriptions = await self.transcribe_batch([audio for _, audio in batch])
+                    for (index, _), transcription in zip(batch, transcriptions):
+                        results[index] = transcription
+                except TranscriptionError as e:
+                    for index, _ in batch:
+                        results[index] = e
+
+            return results
+
+        finally:
+            for temp_path in temp_paths:
+                await self.cleanup_temp_file(temp_path)
+
     async def process_video(self, s3_url: str) -> str:
         """
         Main processing function: download, transcribe, and cleanup
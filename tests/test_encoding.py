@@ -0,0 +1,155 @@
+import gzip
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import app.api.encoding as encoding
+from app.api.encoding import (
+    accepts_encoding, encoded_response, negotiate_content_encoding, negotiate_media_type
+)
+from app.api.fields import parse_fields, project_transcription
+from app.models.video import ProcessingStatus
+
+
+def request(accept=None, accept_encoding=None):
+    headers = []
+    if accept is not None:
+        headers.append((b"accept", accept.encode()))
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture
+def with_msgpack(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", SimpleNamespace(packb=lambda payload, **_: b"packed"))
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", SimpleNamespace(compress=lambda body, **_: b"br"))
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "application/json"),
+    ("*/*", "application/json"),
+    ("application/json", "application/json"),
+    ("application/msgpack", "application/msgpack"),
+    ("application/x-msgpack", "application/msgpack"),
+    ("application/msgpack;q=0", "application/json"),
+    ("application/json, application/msgpack;q=0.5", "application/json"),
+    ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+])
+def test_negotiate_media_type(with_msgpack, accept, expected):
+    assert negotiate_media_type(request(accept)) == expected
+
+
+def test_msgpack_only_without_msgpack_is_406(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+    with pytest.raises(HTTPException) as error:
+        negotiate_media_type(request("application/msgpack"))
+    assert error.value.status_code == 406
+    assert negotiate_media_type(request("application/msgpack, */*;q=0.1")) == "application/json"
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.1", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("br;q=0, *;q=0.5", "gzip"),
+])
+def test_negotiate_content_encoding(with_brotli, accept_encoding, expected):
+    assert negotiate_content_encoding(request(accept_encoding=accept_encoding)) == expected
+
+
+def test_br_not_offered_without_brotli(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", None)
+    assert negotiate_content_encoding(request(accept_encoding="br, gzip;q=0.5")) == "gzip"
+
+
+def test_accepts_encoding_honours_wildcard():
+    assert accepts_encoding(request(accept_encoding="*"), "gzip")
+    assert not accepts_encoding(request(accept_encoding="gzip;q=0, *"), "gzip")
+
+
+def test_encoded_response_compresses_large_bodies(monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", None)
+    payload = {"text": "x" * 2000}
+    response = encoded_response(request(accept_encoding="gzip"), payload, "test")
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.body)) == payload
+
+    small = encoded_response(request(accept_encoding="gzip"), {"a": 1}, "test")
+    assert "content-encoding" not in small.headers
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("text, segments,") == {"text", "segments"}
+    with pytest.raises(HTTPException) as error:
+        parse_fields("text,bogus")
+    assert error.value.status_code == 400
+
+
+def video():
+    segment = {"start": 0.0, "end": 2.0, "text": " Hi", "confidence": 0.0,
+               "words": [{"word": "Hi", "start": 0.0, "end": 0.5}]}
+    analysis = {"sentiment": {"compound": 0.5}, "entities": []}
+    return SimpleNamespace(
+        id=7,
+        status=ProcessingStatus.COMPLETED,
+        processed_time=datetime(2026, 1, 2, 3, 4, 5),
+        transcription=" Hi",
+        transcription_details={
+            "text": " Hi",
+            "segments": [segment],
+            "analysis": {
+                "full_text": analysis,
+                "segments": [{**segment, "nlp_analysis": analysis}]
+            }
+        }
+    )
+
+
+def test_project_without_fields_keeps_full_response():
+    response = project_transcription(video(), None)
+    assert response["transcription"] == " Hi"
+    assert response["details"] == video().transcription_details
+    assert response["processed_time"] == "2026-01-02T03:04:05"
+
+
+def test_project_segments_drop_words():
+    response = project_transcription(video(), parse_fields("text,segments"))
+    assert set(response) == {"id", "status", "processed_time", "transcription", "segments"}
+    assert response["segments"] == [{"start": 0.0, "end": 2.0, "text": " Hi", "confidence": 0.0}]
+
+
+def test_project_words_keep_words():
+    response = project_transcription(video(), parse_fields("words"))
+    assert response["segments"][0]["words"] == [{"word": "Hi", "start": 0.0, "end": 0.5}]
+
+
+def test_project_sentiment_only():
+    response = project_transcription(video(), parse_fields("sentiment"))
+    assert response["sentiment"] == {
+        "full_text": {"compound": 0.5},
+        "segments": [{"start": 0.0, "end": 2.0, "compound": 0.5}]
+    }
+    assert "segments" not in response and "transcription" not in response
+
+
+def test_project_analysis_omits_words_and_text():
+    response = project_transcription(video(), parse_fields("analysis"))
+    assert response["analysis"]["segments"] == [{
+        "start": 0.0, "end": 2.0,
+        "nlp_analysis": {"sentiment": {"compound": 0.5}, "entities": []}
+    }]
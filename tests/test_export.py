@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from app.services.export import ExportFormat, export_segments, format_timestamp
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.5, "text": " Hello there.", "words": []},
+    {"start": 1.5, "end": 2.0, "text": "  ", "words": []},
+    {"start": 3661.25, "end": 3662.0, "text": " Bye.", "words": []},
+]
+
+
+def render(export_format, segments=SEGMENTS):
+    return "".join(export_segments(iter(segments), export_format))
+
+
+@pytest.mark.parametrize("seconds, separator, expected", [
+    (0.0, ",", "00:00:00,000"),
+    (1.5, ".", "00:00:01.500"),
+    (59.9996, ",", "00:01:00,000"),
+    (3661.25, ",", "01:01:01,250"),
+    (-0.2, ".", "00:00:00.000"),
+])
+def test_format_timestamp(seconds, separator, expected):
+    assert format_timestamp(seconds, separator) == expected
+
+
+def test_srt_skips_empty_segments_and_keeps_index_contiguous():
+    assert render(ExportFormat.SRT) == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n\n"
+        "2\n01:01:01,250 --> 01:01:02,000\nBye.\n\n"
+    )
+
+
+def test_vtt_skips_empty_segments():
+    assert render(ExportFormat.VTT) == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nHello there.\n\n"
+        "01:01:01.250 --> 01:01:02.000\nBye.\n\n"
+    )
+
+
+def test_jsonl_writes_one_segment_per_line():
+    lines = render(ExportFormat.JSONL).splitlines()
+    assert [json.loads(line) for line in lines] == SEGMENTS
+
+
+def test_txt_writes_stripped_text():
+    assert render(ExportFormat.TXT) == "Hello there.\n\nBye.\n"
+
+
+def test_writers_are_lazy():
+    def segments():
+        yield SEGMENTS[0]
+        raise AssertionError("read past the first segment")
+
+    chunks = export_segments(segments(), ExportFormat.SRT)
+    assert next(chunks).startswith("1\n")
+
+
+def test_empty_transcript():
+    assert render(ExportFormat.SRT, []) == ""
+    assert render(ExportFormat.VTT, []) == "WEBVTT\n\n"
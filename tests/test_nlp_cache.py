@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+import app.services.nlp_cache as nlp_cache
+from app.services.nlp_cache import NLPCache
+
+
+def entry_size(value):
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def test_memory_round_trip_returns_copies():
+    cache = NLPCache(max_bytes=1024, max_text_length=100)
+    cache.put("a", {"entities": [1]})
+    first = cache.get("a")
+    first["entities"].append(2)
+    assert cache.get("a") == {"entities": [1]}
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_byte_budget_evicts_least_recently_used():
+    value = {"v": "x" * 10}
+    size = entry_size(value)
+    cache = NLPCache(max_bytes=size * 2, max_text_length=100)
+    cache.put("a", value)
+    cache.put("b", value)
+    cache.get("a")
+    cache.put("c", value)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+    assert cache.evictions == 1
+    assert cache.current_bytes == size * 2
+
+
+def test_oversized_values_are_never_stored():
+    cache = NLPCache(max_bytes=16, max_text_length=100)
+    cache.put("small", {"v": 1})
+    cache.put("big", {"v": "x" * 100})
+    assert cache.get("big") is None
+    assert cache.get("small") == {"v": 1}
+    assert cache.evictions == 0
+
+
+def test_long_text_bypasses_cache():
+    cache = NLPCache(max_bytes=1024, max_text_length=5)
+    assert cache.cacheable("short")
+    assert not cache.cacheable("longer text")
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    NLPCache(max_bytes=1024, max_text_length=100, disk_path=path).put("a", {"v": 1})
+
+    cache = NLPCache(max_bytes=1024, max_text_length=100, disk_path=path)
+    assert cache.get("a") == {"v": 1}
+    assert cache.disk_hits == 1
+    # Promoted into memory, so the second lookup is a memory hit
+    assert cache.get("a") == {"v": 1}
+    assert (cache.hits, cache.disk_hits) == (1, 1)
+
+
+def test_prune_disk_drops_oldest_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(nlp_cache, "DISK_PRUNE_INTERVAL", 10)
+    clock = iter(range(1000))
+    monkeypatch.setattr(nlp_cache.time, "time", lambda: float(next(clock)))
+    cache = NLPCache(
+        max_bytes=1024, max_text_length=100,
+        disk_path=str(tmp_path / "cache.db"), max_disk_rows=10
+    )
+    for i in range(20):
+        cache.put(str(i), {"v": i})
+
+    # The check after 10 puts finds the cap respected, the one after 20
+    # prunes down to 90% of it
+    rows = {row[0] for row in cache._disk.execute("SELECT key FROM nlp_cache")}
+    assert rows == {str(i) for i in range(11, 20)}
+    assert cache.disk_evictions == 11
+
+
+@pytest.fixture
+def nlp_service():
+    pytest.importorskip("spacy")
+    pytest.importorskip("vaderSentiment")
+    from app.services.nlp import NLPService
+
+    service = NLPService.__new__(NLPService)
+    service.cache = NLPCache(max_bytes=1024, max_text_length=100)
+    service.pipeline_version = "test"
+    service.analyzed = []
+
+    def analyze(text):
+        service.analyzed.append(text)
+        start = text.index("Paris")
+        return {"entities": [{"text": "Paris", "label": "GPE", "start": start, "end": start + 5}]}
+
+    service._analyze = analyze
+    return service
+
+
+def test_leading_whitespace_shares_entry_and_shifts_offsets(nlp_service):
+    plain = nlp_service.analyze_text("Paris again")
+    padded = nlp_service.analyze_text("   Paris again ")
+
+    assert nlp_service.analyzed == ["Paris again"]
+    assert (plain["entities"][0]["start"], plain["entities"][0]["end"]) == (0, 5)
+    assert (padded["entities"][0]["start"], padded["entities"][0]["end"]) == (3, 8)
+    assert "   Paris again "[3:8] == "Paris"
+    # Shifting the returned copy must not leak back into the cache
+    assert nlp_service.analyze_text("Paris again")["entities"][0]["start"] == 0
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app.services.timeline import _integrate, build_timeline
+
+
+def segment(start, end, compound=0.0, text="text", entities=()):
+    return {
+        "start": start,
+        "end": end,
+        "text": text,
+        "nlp_analysis": {
+            "sentiment": {"compound": compound},
+            "entities": [{"start": offset, "label": label} for offset, label in entities]
+        }
+    }
+
+
+def test_integrate_single_segment():
+    values = _integrate(
+        np.array([2.0]), np.array([6.0]), np.array([0.5]),
+        np.array([0.0, 4.0, 8.0])
+    )
+    assert values == pytest.approx([0.0, 1.0, 2.0])
+
+
+def test_integrate_overlapping_segments():
+    # [0, 4) at 1.0 and [2, 6) at -1.0 cancel out where they overlap
+    values = _integrate(
+        np.array([0.0, 2.0]), np.array([4.0, 6.0]), np.array([1.0, -1.0]),
+        np.array([0.0, 2.0, 4.0, 6.0, 8.0])
+    )
+    assert values == pytest.approx([0.0, 2.0, 2.0, 0.0, 0.0])
+
+
+def test_sentiment_is_duration_weighted():
+    timeline = build_timeline(
+        [segment(0, 2, 1.0), segment(2, 10, -0.5)],
+        resolutions=(10,)
+    )
+    # (2 * 1.0 + 8 * -0.5) / 10
+    assert timeline["resolutions"]["10"]["sentiment"] == pytest.approx([-0.2])
+
+
+def test_overlapping_segments_average_by_coverage():
+    timeline = build_timeline(
+        [segment(0, 10, 1.0), segment(5, 10, 0.0)],
+        resolutions=(10,)
+    )
+    # 10s of 1.0 and 5s of 0.0 over 15s of speech
+    assert timeline["resolutions"]["10"]["sentiment"] == pytest.approx([0.6667])
+
+
+def test_buckets_without_speech_are_none():
+    timeline = build_timeline(
+        [segment(0, 5, 0.4), segment(25, 30, -0.4)],
+        resolutions=(10,)
+    )
+    assert timeline["resolutions"]["10"]["sentiment"] == [0.4, None, -0.4]
+
+
+def test_entities_are_counted_per_bucket():
+    timeline = build_timeline(
+        [
+            segment(0, 10, text="Bob and Alice", entities=[(0, "PERSON"), (8, "PERSON")]),
+            segment(10, 20, text="in Paris", entities=[(3, "GPE")]),
+        ],
+        resolutions=(5,)
+    )
+    entities = timeline["resolutions"]["5"]["entities"]
+    assert entities["PERSON"] == {"index": [0, 1], "count": [1, 1]}
+    assert entities["GPE"] == {"index": [2], "count": [1]}
+
+
+def test_trailing_zero_length_segment_extends_duration():
+    timeline = build_timeline(
+        [segment(0, 5), segment(25, 25, text="Paris", entities=[(0, "GPE")])],
+        resolutions=(10,)
+    )
+    assert timeline["duration"] == 25
+    assert timeline["resolutions"]["10"]["entities"]["GPE"] == {"index": [2], "count": [1]}
+
+
+def test_empty_segments():
+    timeline = build_timeline([], resolutions=(60,))
+    assert timeline["duration"] == 0.0
+    assert timeline["resolutions"]["60"]["sentiment"] == [None]
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+pytest.importorskip("whisper")
+pytest.importorskip("spacy")
+
+import app.cli.transcribe_worker as worker
+from app.cli.transcribe_worker import LeaseHeartbeat
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def test_heartbeat_renews_until_released(monkeypatch):
+    renewed = []
+
+    async def heartbeat(db, video_ids):
+        renewed.append(sorted(video_ids))
+
+    monkeypatch.setattr(worker, "SessionLocal", FakeSession)
+    monkeypatch.setattr(worker.VideoRepository, "heartbeat", heartbeat)
+
+    with LeaseHeartbeat([1, 2], interval=0.01) as lease:
+        time.sleep(0.05)
+        lease.release(1)
+        time.sleep(0.02)
+        renewed.clear()
+        time.sleep(0.05)
+
+    assert renewed and all(ids == [2] for ids in renewed)
+    stopped_at = len(renewed)
+    time.sleep(0.03)
+    assert len(renewed) == stopped_at
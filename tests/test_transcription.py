@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("whisper")
+
+from app.services.transcription import TranscriptionService
+
+TIMESTAMP_BEGIN = 1000
+
+
+class FakeTokenizer:
+    timestamp_begin = TIMESTAMP_BEGIN
+
+    def decode(self, tokens):
+        return "".join(f" w{token}" for token in tokens)
+
+
+def ts(seconds):
+    return TIMESTAMP_BEGIN + round(seconds / 0.02)
+
+
+@pytest.fixture
+def service():
+    # _segments_from_tokens needs no model or S3 client
+    return TranscriptionService.__new__(TranscriptionService)
+
+
+def test_paired_timestamp_tokens_split_segments(service):
+    tokens = [ts(0.0), 1, 2, ts(2.4), ts(2.4), 3, ts(5.0)]
+    segments = service._segments_from_tokens(tokens, FakeTokenizer(), duration=6.0)
+    assert [(s["start"], s["end"], s["text"]) for s in segments] == [
+        (0.0, 2.4, " w1 w2"),
+        (2.4, 5.0, " w3"),
+    ]
+    assert all(s["words"] == [] for s in segments)
+
+
+def test_gap_between_segments_starts_at_next_timestamp(service):
+    tokens = [ts(0.0), 1, ts(1.0), ts(3.0), 2, ts(4.0)]
+    segments = service._segments_from_tokens(tokens, FakeTokenizer(), duration=5.0)
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 1.0), (3.0, 4.0)]
+
+
+def test_unterminated_segment_ends_at_duration(service):
+    tokens = [ts(1.0), 1, 2]
+    segments = service._segments_from_tokens(tokens, FakeTokenizer(), duration=3.5)
+    assert [(s["start"], s["end"]) for s in segments] == [(1.0, 3.5)]
+
+
+def test_without_timestamps_covers_whole_clip(service):
+    segments = service._segments_from_tokens([1, 2], FakeTokenizer(), duration=7.0)
+    assert [(s["start"], s["end"], s["text"]) for s in segments] == [(0.0, 7.0, " w1 w2")]
+
+
+def test_timestamps_are_clamped_to_duration(service):
+    tokens = [ts(0.0), 1, ts(29.0)]
+    segments = service._segments_from_tokens(tokens, FakeTokenizer(), duration=10.0)
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 10.0)]
+
+
+def test_timestamps_without_text_produce_no_segments(service):
+    assert service._segments_from_tokens([ts(0.0), ts(1.0)], FakeTokenizer(), 2.0) == []